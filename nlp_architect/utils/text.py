@@ -13,21 +13,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ******************************************************************************
-import re
 import string
 import sys
 from os import path
 from typing import List, Tuple
 
 import spacy
-from nltk import WordNetLemmatizer
-from nltk.stem.snowball import EnglishStemmer
 from spacy.cli.download import download as spacy_download
-from spacy.lang.en import LEMMA_EXC, LEMMA_INDEX, LEMMA_RULES
-from spacy.lemmatizer import Lemmatizer
 from nlp_architect.utils.generic import license_prompt
 from joblib import Parallel, delayed
-from functools import partial
+from functools import lru_cache, partial
 from spacy.util import minibatch
 from nlp_architect.common.core_nlp_doc import CoreNLPDoc
 from pathlib import Path
@@ -38,10 +33,15 @@ class Vocabulary:
     A vocabulary that maps words to ints (storing a vocabulary)
     """
 
+    # offset added to the stored word ids (see `add_vocab_offset`), class level default
+    # keeps vocabularies pickled without this attribute working
+    _offset = 0
+
     def __init__(self, start=0, include_oov=True):
 
         self._vocab = {}
         self._rev_vocab = {}
+        self._offset = 0
         self.include_oov = include_oov
         if include_oov:
             self._vocab["<UNK>"] = start
@@ -61,11 +61,13 @@ class Vocabulary:
         Returns:
             int: id of added word
         """
-        if word not in self._vocab.keys():
-            self._vocab[word] = self.next
-            self._rev_vocab[self.next] = word
+        wid = self._vocab.get(word)
+        if wid is None:
+            wid = self.next - self._offset
+            self._vocab[word] = wid
+            self._rev_vocab[wid] = word
             self.next += 1
-        return self._vocab.get(word)
+        return wid + self._offset
 
     def word_id(self, word):
         """
@@ -77,9 +79,10 @@ class Vocabulary:
         Returns:
             int: int id of word
         """
-        if hasattr(self, "oov_id"):
-            return self._vocab.get(word, self.oov_id)
-        return self._vocab.get(word, None)
+        wid = self._vocab.get(word)
+        if wid is None:
+            return getattr(self, "oov_id", None)
+        return wid + self._offset
 
     def __getitem__(self, item):
         """
@@ -94,7 +97,7 @@ class Vocabulary:
         return vocab_size
 
     def __iter__(self):
-        for word in self.vocab.keys():
+        for word in self._vocab.keys():
             yield word
 
     @property
@@ -111,28 +114,29 @@ class Vocabulary:
         Returns:
             str: string of given word id
         """
-        return self._rev_vocab.get(wid)
+        return self._rev_vocab.get(wid - self._offset)
 
     @property
     def vocab(self):
         """
         dict: get the dict object of the vocabulary
         """
-        return self._vocab
+        if self._offset == 0:
+            return self._vocab
+        return {k: v + self._offset for k, v in self._vocab.items()}
 
     def add_vocab_offset(self, offset):
         """
-        Adds an offset to the ints of the vocabulary
+        Adds an offset to the ints of the vocabulary. The offset is applied lazily
+        when ids are looked up, the stored mappings are not rebuilt.
 
         Args:
             offset (int): an int offset
         """
-        new_vocab = {}
-        for k, v in self.vocab.items():
-            new_vocab[k] = v + offset
+        self._offset += offset
         self.next += offset
-        self._vocab = new_vocab
-        self._rev_vocab = {v: k for k, v in new_vocab.items()}
+        if hasattr(self, "oov_id"):
+            self.oov_id += offset
 
     def reverse_vocab(self):
         """
@@ -141,7 +145,9 @@ class Vocabulary:
         Returns:
             dict: reversed vocabulary object
         """
-        return self._rev_vocab
+        if self._offset == 0:
+            return self._rev_vocab
+        return {k + self._offset: v for k, v in self._rev_vocab.items()}
 
 
 all_letters = string.ascii_letters + " .,;'"
@@ -278,10 +284,47 @@ class SpacyInstance:
         return [t.text for t in self.parser(text)]
 
 
-stemmer = EnglishStemmer()
-lemmatizer = WordNetLemmatizer()
-spacy_lemmatizer = Lemmatizer(LEMMA_INDEX, LEMMA_EXC, LEMMA_RULES)
-p = re.compile(r"[ \-,;.@&_]")
+# maps normalizer token separators ( -,;.@&_) to whitespace
+_separators_table = str.maketrans(" -,;.@&_", " " * 8)
+
+
+# stemmer/lemmatizers are only built (and nltk/spacy lemma tables loaded) on first use
+@lru_cache(maxsize=None)
+def _get_stemmer():
+    from nltk.stem.snowball import EnglishStemmer
+
+    return EnglishStemmer()
+
+
+@lru_cache(maxsize=None)
+def _get_lemmatizer():
+    from nltk import WordNetLemmatizer
+
+    return WordNetLemmatizer()
+
+
+@lru_cache(maxsize=None)
+def _get_spacy_lemmatizer():
+    from spacy.lang.en import LEMMA_EXC, LEMMA_INDEX, LEMMA_RULES
+    from spacy.lemmatizer import Lemmatizer
+
+    return Lemmatizer(LEMMA_INDEX, LEMMA_EXC, LEMMA_RULES)
+
+
+# token distribution is Zipfian, memoize per-token stemming/lemmatization
+@lru_cache(maxsize=200000)
+def _stem(token):
+    return _get_stemmer().stem(token)
+
+
+@lru_cache(maxsize=200000)
+def _lemmatize(token):
+    return _get_lemmatizer().lemmatize(token)
+
+
+@lru_cache(maxsize=200000)
+def _spacy_lemmatize_noun(token):
+    return _get_spacy_lemmatizer()(token, "NOUN")[0]
 
 
 class Stopwords(object):
@@ -303,17 +346,20 @@ class Stopwords(object):
         return Stopwords.stop_words
 
 
+@lru_cache(maxsize=1000000)
 def simple_normalizer(text):
     """
     Simple text normalizer. Runs each token of a phrase thru wordnet lemmatizer
     and a stemmer.
     """
-    if not str(text).isupper() or not str(text).endswith("S") or not len(text.split()) == 1:
-        tokens = list(filter(lambda x: len(x) != 0, p.split(text.strip())))
-        text = " ".join([stemmer.stem(lemmatizer.lemmatize(t)) for t in tokens])
+    # single word, all caps plural acronyms (e.g. "CPUS") are kept as is
+    if not (text.isupper() and text.endswith("S") and len(text.split()) == 1):
+        tokens = text.strip().translate(_separators_table).split()
+        text = " ".join([_stem(_lemmatize(t)) for t in tokens])
     return text
 
 
+@lru_cache(maxsize=1000000)
 def spacy_normalizer(text, lemma=None):
     """
     Simple text normalizer using spacy lemmatizer. Runs each token of a phrase
@@ -323,13 +369,14 @@ def spacy_normalizer(text, lemma=None):
         lemma(string): lemma of the given text. in this case only stemmer will
         run.
     """
-    if not str(text).isupper() or not str(text).endswith("S") or not len(text.split()) == 1:
-        tokens = list(filter(lambda x: len(x) != 0, p.split(text.strip())))
+    # single word, all caps plural acronyms (e.g. "CPUS") are kept as is
+    if not (text.isupper() and text.endswith("S") and len(text.split()) == 1):
         if lemma:
             lemma = lemma.split(" ")
-            text = " ".join([stemmer.stem(lem) for lem in lemma])
+            text = " ".join([_stem(lem) for lem in lemma])
         else:
-            text = " ".join([stemmer.stem(spacy_lemmatizer(t, "NOUN")[0]) for t in tokens])
+            tokens = text.strip().translate(_separators_table).split()
+            text = " ".join([_stem(_spacy_lemmatize_noun(t)) for t in tokens])
     return text
 
 
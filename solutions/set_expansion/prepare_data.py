@@ -21,7 +21,10 @@ marks extracted NP's.
 import gzip
 import json
 import logging
+import sys
 from argparse import ArgumentParser
+from collections import Counter, defaultdict
+from functools import lru_cache
 from os import path, makedirs
 
 from tqdm import tqdm
@@ -34,36 +37,42 @@ from nlp_architect.utils.text import spacy_normalizer, SpacyInstance
 logger = logging.getLogger(__name__)
 
 np2id = {}
-id2group = {}
+# group norm -> ordered set (dict with None values) of the group's noun phrases
+id2group = defaultdict(dict)
 id2rep = {}
-np2count = {}
+np2count = Counter()
 nlp_chunker_url = "https://d2zs9tzlek599f.cloudfront.net/models/chunker/"
 chunker_path = str(LIBRARY_OUT / "chunker-pretrained")
 chunker_model_dat_file = "model_info.dat.params"
 chunker_model_file = "model.h5"
+# number of marked lines buffered in memory before each write to the marked corpus
+WRITE_BATCH_SIZE = 500
 
 
-def get_group_norm(spacy_span):
+def get_group_norm(spacy_span, lemma=None, mark_char="_"):
     """
     Give a span, determine the its group and return the normalized text representing the group
 
     Args:
             spacy_span (spacy.tokens.Span)
+            lemma (str, optional): the span's lemma, if already computed by the caller
+            mark_char (str): NP marking character, removed from the normalized text
     """
-    np = spacy_span.text
-    norm = spacy_normalizer(np, spacy_span.lemma_)
-    if args.mark_char in norm:
-        norm = norm.replace(args.mark_char, " ")
-    if np not in np2count:  # new np
-        np2count[np] = 1
+    # np/norm are keys of several grouping dicts, intern them so each is stored once
+    np = sys.intern(spacy_span.text)
+    if lemma is None:
+        lemma = spacy_span.lemma_
+    norm = spacy_normalizer(np, lemma)
+    if mark_char in norm:
+        norm = norm.replace(mark_char, " ")
+    norm = sys.intern(norm)
+    np2count[np] += 1
+    if np2count[np] == 1:  # new np
         np2id[np] = norm
-        if norm in id2group:  # norm already exist
-            id2group[norm].append(np)
-        else:
-            id2group[norm] = [np]
+        if norm not in id2group:  # new norm
             id2rep[norm] = np
+        id2group[norm][np] = None
     else:  # another occurrence of this np. norm must exist and be consistent
-        np2count[np] += 1
         if np2id[np] != norm:  # new norm to the same np - merge groups.
             #  no need to update np2id[np]
             norm = merge_groups(np, np2id[np], norm)  # set to the already exist
@@ -75,8 +84,9 @@ def get_group_norm(spacy_span):
     return norm
 
 
+@lru_cache(maxsize=None)
 def load_parser(chunker):
-    # load spacy parser
+    # load spacy parser (cached per chunker; NER/textcat are never deserialized)
     logger.info("loading spacy. chunker=%s", chunker)
     if "nlp_arch" in chunker:
         parser = SpacyInstance(model="en_core_web_sm", disable=["textcat", "ner", "parser"]).parser
@@ -95,79 +105,88 @@ def load_parser(chunker):
             download_unlicensed_file(nlp_chunker_url, chunker_model_dat_file, _path_to_params)
         parser.add_pipe(NPAnnotator.load(_path_to_model, _path_to_params), last=True)
     else:
+        # tagger is needed even without grouping: spacy 2.x noun_chunks filters heads by POS and
+        # mark_span checks the span lemma for pronouns
         parser = SpacyInstance(model="en_core_web_sm", disable=["textcat", "ner"]).parser
     logger.info("spacy loaded")
     return parser
 
 
-def extract_noun_phrases(docs, nlp_parser, chunker):
+def extract_noun_phrases(docs, nlp_parser, chunker, batch_size=256):
     logger.info("extract nps from: %s", docs)
     spans = []
-    for doc in nlp_parser.pipe(docs, n_threads=-1):
+    for doc in nlp_parser.pipe(docs, batch_size=batch_size):
         if "nlp_arch" in chunker:
             spans.extend(get_noun_phrases(doc))
         else:
-            nps = list(doc.noun_chunks)
-            spans.extend(nps)
+            spans.extend(doc.noun_chunks)
     logger.info("nps= %s", str(spans))
     return spans
 
 
-# pylint: disable-msg=too-many-nested-blocks,too-many-branches
+def mark_span(spacy_span, mark_char="_", grouping=False):
+    """
+    Return the text of a noun phrase span, marked with mark_char if it is a valid NP
+
+    Args:
+            spacy_span (spacy.tokens.Span)
+            mark_char (str): NP word separator and suffix
+            grouping (bool): replace the NP text with its group normalized text
+    """
+    lemma = spacy_span.lemma_
+    if len(spacy_span.text) > 1 and lemma != "-PRON-":
+        if grouping:
+            text = get_group_norm(spacy_span, lemma, mark_char)
+        else:
+            text = spacy_span.text
+        # mark NP's
+        return text.replace(" ", mark_char) + mark_char
+    return spacy_span.text
+
+
 def mark_noun_phrases(
-    corpus_file, marked_corpus_file, nlp_parser, lines_count, chunker, mark_char="_", grouping=False
+    corpus_file,
+    marked_corpus_file,
+    nlp_parser,
+    chunker,
+    mark_char="_",
+    grouping=False,
+    batch_size=256,
 ):
-    i = 0
-    with tqdm(total=lines_count) as pbar:
-        for doc in nlp_parser.pipe(corpus_file, n_threads=-1):
+    out_buf = []
+    # blank lines are not passed to the parser (and are not written to the marked corpus)
+    lines = ((line, line_i) for line_i, line in enumerate(corpus_file) if line.strip())
+    # corpus size is not known in advance (no extra pass over gzip corpora); report lines processed
+    with tqdm(unit=" lines") as pbar:
+        for doc, line_i in nlp_parser.pipe(lines, as_tuples=True, batch_size=batch_size):
             if "nlp_arch" in chunker:
                 spans = get_noun_phrases(doc)
             else:
-                spans = list(doc.noun_chunks)
-            i += 1
-            if len(spans) > 0:
-                span = spans.pop(0)
-            else:
-                span = None
-            span_written = False
-            for token in doc:
-                if span is None:
-                    if len(token.text.strip()) > 0:
-                        marked_corpus_file.write(token.text + " ")
-                else:
-                    if token.idx < span.start_char or token.idx >= span.end_char:  # outside a
-                        # span
-                        if len(token.text.strip()) > 0:
-                            marked_corpus_file.write(token.text + " ")
-                    else:
-                        if not span_written:
-                            # mark NP's
-                            if len(span.text) > 1 and span.lemma_ != "-PRON-":
-                                if grouping:
-                                    text = get_group_norm(span)
-                                else:
-                                    text = span.text
-                                # mark NP's
-                                text = text.replace(" ", mark_char) + mark_char
-                                marked_corpus_file.write(text + " ")
-                            else:
-                                marked_corpus_file.write(span.text + " ")
-                            span_written = True
-                        if token.idx + len(token.text) == span.end_char:
-                            if len(spans) > 0:
-                                span = spans.pop(0)
-                            else:
-                                span = None
-                            span_written = False
-            marked_corpus_file.write("\n")
-            pbar.update(1)
+                # consumed lazily, spans are yielded in document order
+                spans = doc.noun_chunks
+            # extract token texts once, slicing a list avoids creating Span/Token objects
+            words = [t.text for t in doc]
+            parts = []
+            t_i = 0
+            for span in spans:
+                # tokens preceding the span
+                parts.extend(w for w in words[t_i : span.start] if w.strip())
+                parts.append(mark_span(span, mark_char, grouping))
+                t_i = span.end
+            parts.extend(w for w in words[t_i:] if w.strip())
+            out_buf.append("".join(text + " " for text in parts) + "\n")
+            if len(out_buf) == WRITE_BATCH_SIZE:
+                marked_corpus_file.writelines(out_buf)
+                out_buf.clear()
+            pbar.update(line_i + 1 - pbar.n)
+    marked_corpus_file.writelines(out_buf)
 
 
 def merge_groups(np, old_id, diff_id):
     if diff_id in id2group:
         for term in id2group[diff_id]:  # for each term update dicts
             np2id[term] = old_id
-            id2group[old_id].append(term)
+            id2group[old_id][term] = None
             if np2count[term] > np2count[id2rep[old_id]]:
                 id2rep[old_id] = term
         id2rep.pop(diff_id)
@@ -178,6 +197,23 @@ def merge_groups(np, old_id, diff_id):
     return old_id
 
 
+def write_json_dict(items, json_file):
+    """
+    Write (key, value) pairs to a file as a single JSON object, one entry at a time, so the
+    whole JSON string is never materialized in memory. Output is identical to json.dumps.
+
+    Args:
+            items (iterable): (key, value) pairs
+            json_file (file): opened text file
+    """
+    json_file.write("{")
+    sep = ""
+    for k, v in items:
+        json_file.write(sep + json.dumps(k) + ": " + json.dumps(v))
+        sep = ", "
+    json_file.write("}")
+
+
 if __name__ == "__main__":
     arg_parser = ArgumentParser(__doc__)
     arg_parser.add_argument(
@@ -213,6 +249,12 @@ if __name__ == "__main__":
         help="chunker to use for detecting noun phrases. 'spacy' for using spacy built-in "
         "chunker or 'nlp_arch' for NLP Architect NP Extractor",
     )
+    arg_parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=256,
+        help="number of corpus lines passed to the spacy pipeline per batch. Default value is 256.",
+    )
 
     args = arg_parser.parse_args()
     if args.corpus.endswith("gz"):
@@ -223,29 +265,28 @@ if __name__ == "__main__":
         mode = "r"
 
     with open_func(args.corpus, mode, encoding="utf8", errors="ignore") as my_corpus_file:
-        with open(args.marked_corpus, "w", encoding="utf8") as my_marked_corpus_file:
+        with open(
+            args.marked_corpus, "w", encoding="utf8", buffering=1 << 20
+        ) as my_marked_corpus_file:
             nlp = load_parser(args.chunker)
-            num_lines = sum(1 for line in my_corpus_file)
-            my_corpus_file.seek(0)
-            logger.info("%i lines in corpus", num_lines)
             mark_noun_phrases(
                 my_corpus_file,
                 my_marked_corpus_file,
                 nlp,
-                num_lines,
                 mark_char=args.mark_char,
                 grouping=args.grouping,
                 chunker=args.chunker,
+                batch_size=args.batch_size,
             )
 
         # write grouping data :
         if args.grouping:
             corpus_dir = path.dirname(args.marked_corpus)
             with open(path.join(corpus_dir, "id2group"), "w", encoding="utf8") as id2group_file:
-                id2group_file.write(json.dumps(id2group))
+                write_json_dict(((k, list(v)) for k, v in id2group.items()), id2group_file)
 
             with open(path.join(corpus_dir, "id2rep"), "w", encoding="utf8") as id2rep_file:
-                id2rep_file.write(json.dumps(id2rep))
+                write_json_dict(id2rep.items(), id2rep_file)
 
             with open(path.join(corpus_dir, "np2id"), "w", encoding="utf8") as np2id_file:
-                np2id_file.write(json.dumps(np2id))
+                write_json_dict(np2id.items(), np2id_file)
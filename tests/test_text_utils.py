@@ -0,0 +1,53 @@
+# ******************************************************************************
+# Copyright 2017-2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from nlp_architect.utils.text import Vocabulary
+
+
+def test_vocabulary_add():
+    vocab = Vocabulary(start=1)
+    assert vocab.add("a") == 2
+    assert vocab.add("b") == 3
+    assert vocab.add("a") == 2
+    assert vocab.word_id("b") == 3
+    assert vocab.word_id("c") == vocab.oov_id == 1
+    assert vocab.id_to_word(3) == "b"
+
+
+def test_vocabulary_offset():
+    vocab = Vocabulary(start=0)
+    vocab.add("a")
+    vocab.add("b")
+    vocab.add_vocab_offset(5)
+    assert vocab.vocab == {"<UNK>": 5, "a": 6, "b": 7}
+    assert vocab.reverse_vocab() == {5: "<UNK>", 6: "a", 7: "b"}
+    assert vocab.word_id("a") == 6
+    assert vocab.word_id("c") == vocab.oov_id == 5
+    assert vocab.id_to_word(7) == "b"
+    assert vocab.add("c") == 8
+    assert vocab.id_to_word(8) == "c"
+    assert vocab.max == 9
+
+
+def test_vocabulary_offset_accumulates():
+    vocab = Vocabulary(start=0, include_oov=False)
+    vocab.add("a")
+    vocab.add_vocab_offset(2)
+    vocab.add("b")
+    vocab.add_vocab_offset(3)
+    assert vocab.vocab == {"a": 5, "b": 6}
+    assert vocab.reverse_vocab() == {5: "a", 6: "b"}
+    assert vocab.word_id("c") is None
+    assert vocab.id_to_word(0) is None